@@ -0,0 +1,117 @@
+"""
+Allocation/RSS measurement for the reused display/record buffers.
+
+Streams synthetic JPEG frames over loopback for a fixed duration and runs the
+consumer path (colour conversion + resize for recording) either the old way,
+allocating fresh arrays per frame, or into arrays reused as cv2 dst. Each mode
+runs in its own process so RSS numbers are not polluted by the other run.
+Both modes use the same TCPClient receive path, so only the consumer differs.
+Besides RSS and tracemalloc it reports minor page faults and consumer time
+per frame: freed large arrays go back to the OS, so fresh allocations show
+up as page faults rather than RSS growth.
+
+    python bench_frame_pool.py                      # 10 minutes per mode
+    python bench_frame_pool.py --duration 60 --mode reused
+"""
+import argparse
+import resource
+import socket
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+
+import cv2
+
+from dev_support import current_rss_mb, run_synthetic_server
+from networking_module import TCPClient
+
+
+FRAME_SIZE = (1280, 720)
+RECORD_SIZE = (640, 480)
+
+
+class Consumer:
+    """Mimics update_video_frame + recorder without a display."""
+
+    def __init__(self, reused):
+        self.reused = reused
+        self.frames = 0
+        self.seconds = 0.0
+        self.rgb_frame = None
+        self.record_frame = None
+
+    def __call__(self, frame):
+        self.frames += 1
+        start = time.perf_counter()
+        if self.reused:
+            self.rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.rgb_frame)
+            self.record_frame = cv2.resize(frame, RECORD_SIZE, dst=self.record_frame)
+        else:
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            resized = cv2.resize(frame, RECORD_SIZE)
+        self.seconds += time.perf_counter() - start
+
+
+def run_mode(mode, duration, fps, sample_interval):
+    tracemalloc.start()
+    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server_socket.bind(("127.0.0.1", 0))
+    server_socket.listen(1)
+    port = server_socket.getsockname()[1]
+    threading.Thread(
+        target=run_synthetic_server, args=(server_socket, fps),
+        kwargs={"duration": duration, "size": FRAME_SIZE}, daemon=True
+    ).start()
+
+    client = TCPClient("127.0.0.1", port)
+    client.connect()
+    consumer = Consumer(reused=(mode == "reused"))
+    receiver = threading.Thread(target=client.receive_video_stream, args=(consumer,), daemon=True)
+
+    start = time.monotonic()
+    start_rss = current_rss_mb()
+    start_faults = resource.getrusage(resource.RUSAGE_SELF).ru_minflt
+    receiver.start()
+    samples = []
+    while receiver.is_alive():
+        receiver.join(timeout=sample_interval)
+        current, peak = tracemalloc.get_traced_memory()
+        samples.append((time.monotonic() - start, current_rss_mb(), current / 1e6, peak / 1e6, consumer.frames))
+        elapsed, rss, traced, traced_peak, frames = samples[-1]
+        print(f"[{mode}] t={elapsed:6.0f}s rss={rss:7.1f}MB traced={traced:6.2f}MB "
+              f"traced_peak={traced_peak:6.2f}MB frames={frames}", flush=True)
+    client.disconnect()
+    faults = resource.getrusage(resource.RUSAGE_SELF).ru_minflt - start_faults
+
+    rss_values = [s[1] for s in samples]
+    frames = max(1, consumer.frames)
+    print(f"[{mode}] summary: frames={consumer.frames} rss_start={start_rss:.1f}MB "
+          f"rss_end={rss_values[-1]:.1f}MB rss_max={max(rss_values):.1f}MB "
+          f"traced_peak={samples[-1][3]:.2f}MB minor_faults/frame={faults / frames:.0f} "
+          f"consumer={consumer.seconds / frames * 1000:.2f}ms/frame", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["baseline", "reused", "both"], default="both")
+    parser.add_argument("--duration", type=float, default=600, help="seconds per mode")
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--sample-interval", type=float, default=10)
+    args = parser.parse_args()
+
+    if args.mode != "both":
+        run_mode(args.mode, args.duration, args.fps, args.sample_interval)
+        return
+
+    for mode in ("baseline", "reused"):
+        subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--duration", str(args.duration),
+             "--fps", str(args.fps), "--sample-interval", str(args.sample_interval)],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
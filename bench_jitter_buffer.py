@@ -0,0 +1,107 @@
+"""
+Display pacing benchmark for PlayoutBuffer under a synthetic bursty sender.
+
+Frames are captured at a fixed rate but delivered the way Wi-Fi tends to
+deliver them: small random jitter, periodic holds that release several frames
+at once, and an occasional long stall. The same arrival schedule is played
+twice in real time, once displaying each frame on arrival (current behaviour)
+and once through PlayoutBuffer, and the inter-frame display intervals and
+end-to-end latency of both runs are reported.
+
+    python bench_jitter_buffer.py --duration 20
+    python bench_jitter_buffer.py --no-stalls     # bursts only
+"""
+import argparse
+import random
+import threading
+import time
+
+from networking_module import PlayoutBuffer
+
+
+def make_arrival_schedule(duration, fps, seed, stalls=True):
+    """Return (capture_offset, arrival_offset) pairs relative to the run start."""
+    rng = random.Random(seed)
+    interval = 1.0 / fps
+    schedule = []
+    hold_until = 0.0
+    last_arrival = 0.0
+    for i in range(int(duration * fps)):
+        captured = i * interval
+        arrival = captured + 0.005 + rng.uniform(0, 0.01)
+        # Every so often the link holds frames and releases them in a burst
+        if rng.random() < 0.08:
+            hold_until = arrival + rng.uniform(0.06, 0.12)
+        # ...and rarely stalls for long enough to trigger latest-frame mode
+        if stalls and rng.random() < 0.003:
+            hold_until = arrival + 0.6
+        arrival = max(arrival, hold_until, last_arrival)
+        last_arrival = arrival
+        schedule.append((captured, arrival))
+    return schedule
+
+
+def summarize(label, display_times, latencies):
+    intervals = [b - a for a, b in zip(display_times, display_times[1:])]
+    mean = sum(intervals) / len(intervals)
+    variance = sum((i - mean) ** 2 for i in intervals) / (len(intervals) - 1)
+    ordered = sorted(intervals)
+    p99 = ordered[int(0.99 * (len(ordered) - 1))]
+    print(f"{label:>10}: frames={len(display_times)} interval mean={mean * 1000:.1f}ms "
+          f"stdev={variance ** 0.5 * 1000:.1f}ms var={variance * 1e6:.1f}ms^2 p99={p99 * 1000:.1f}ms "
+          f"latency mean={sum(latencies) / len(latencies) * 1000:.1f}ms max={max(latencies) * 1000:.1f}ms")
+
+
+def play(schedule, deliver):
+    """Call deliver(capture_time) at each scheduled arrival time."""
+    start = time.time()
+    for captured, arrival in schedule:
+        delay = start + arrival - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        deliver(start + captured)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-stalls", action="store_true", help="bursts only, no long stalls")
+    args = parser.parse_args()
+
+    schedule = make_arrival_schedule(args.duration, args.fps, args.seed, stalls=not args.no_stalls)
+
+    # Before: display on arrival
+    display_times, latencies = [], []
+
+    def display_now(captured):
+        display_times.append(time.monotonic())
+        latencies.append(time.time() - captured)
+
+    play(schedule, display_now)
+    summarize("immediate", display_times, latencies)
+
+    # After: pace through the playout buffer
+    paced_times, paced_latencies = [], []
+    lock = threading.Lock()
+
+    def display_paced(captured):
+        with lock:
+            paced_times.append(time.monotonic())
+            paced_latencies.append(time.time() - captured)
+
+    playout = PlayoutBuffer(display_paced)
+    playout.start()
+    play(schedule, lambda captured: playout.push(captured, captured))
+    time.sleep(playout.max_delay + 0.1)
+    playout.stop()
+    summarize("playout", paced_times, paced_latencies)
+
+    stats = playout.stats()
+    print(f"{'playout':>10}: jitter={stats['jitter_ms']:.1f}ms delay={stats['delay_ms']:.1f}ms "
+          f"dropped={stats['dropped']} late={stats['late']}")
+
+
+if __name__ == "__main__":
+    main()
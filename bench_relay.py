@@ -0,0 +1,181 @@
+"""
+Loopback load test for stream_relay.py.
+
+Runs a synthetic upstream server, starts the relay as a subprocess and
+connects dozens of TCP viewers (a fraction of them deliberately slow) plus a
+few HTTP MJPEG viewers. Every payload carries a sequence number and send
+timestamp, so viewers can measure latency and count frames the relay dropped
+for them. Slow viewers use a small receive buffer, so their latency is
+bounded by the relay's queue and send buffer (a few frames) rather than by
+kernel buffering.
+
+    python bench_relay.py --viewers 48 --slow-viewers 8 --duration 20
+"""
+import argparse
+import os
+import resource
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+from dev_support import percentile
+from networking_module import TCPClient
+
+
+PAYLOAD_HEADER = struct.Struct(">Qd")  # sequence number, send time
+SLOW_VIEWER_PROFILE = {"nodelay": True, "recv_buffer": 64 * 1024}
+
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+
+def run_upstream(server_socket, stop_event, fps, payload_size):
+    conn, _ = server_socket.accept()
+    padding = os.urandom(payload_size - PAYLOAD_HEADER.size)
+    interval = 1.0 / fps
+    next_send = time.monotonic()
+    seq = 0
+    try:
+        while not stop_event.is_set():
+            seq += 1
+            payload = PAYLOAD_HEADER.pack(seq, time.time()) + padding
+            conn.sendall(struct.pack(">L", len(payload)))
+            conn.sendall(payload)
+            next_send += interval
+            delay = next_send - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+    except OSError:
+        pass
+    finally:
+        conn.close()
+        server_socket.close()
+
+
+class ViewerStats:
+    def __init__(self, slow_delay=0.0):
+        self.slow_delay = slow_delay
+        self.received = 0
+        self.first_seq = None
+        self.last_seq = 0
+        self.latencies = []
+
+    def on_payload(self, payload):
+        seq, sent_at = PAYLOAD_HEADER.unpack_from(payload)
+        self.latencies.append(time.time() - sent_at)
+        if self.first_seq is None:
+            self.first_seq = seq
+        self.last_seq = seq
+        self.received += 1
+        if self.slow_delay:
+            time.sleep(self.slow_delay)
+
+    def missed(self):
+        if self.first_seq is None:
+            return 0
+        return (self.last_seq - self.first_seq + 1) - self.received
+
+
+def run_tcp_viewer(port, stats):
+    # A viewer that cannot keep up should not buffer far ahead either
+    profile = SLOW_VIEWER_PROFILE if stats.slow_delay else "low_latency"
+    client = TCPClient("127.0.0.1", port, socket_profile=profile)
+    client.connect()
+    stats.client = client
+    client.receive_raw_stream(stats.on_payload)
+
+
+def run_http_viewer(port, stats, stop_event):
+    conn = socket.create_connection(("127.0.0.1", port))
+    conn.sendall(b"GET / HTTP/1.0\r\n\r\n")
+    stream = conn.makefile("rb")
+    try:
+        # Response headers
+        while stream.readline() not in (b"\r\n", b""):
+            pass
+        while not stop_event.is_set():
+            length = None
+            line = stream.readline()
+            if not line:
+                break
+            while line not in (b"\r\n", b""):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+                line = stream.readline()
+            if length is None:
+                continue
+            stats.on_payload(stream.read(length))
+            stream.read(2)
+    except (OSError, ValueError):
+        pass
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--viewers", type=int, default=48)
+    parser.add_argument("--slow-viewers", type=int, default=8, help="viewers that take 200 ms per frame")
+    parser.add_argument("--http-viewers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--payload-size", type=int, default=60 * 1024)
+    args = parser.parse_args()
+
+    stop_event = threading.Event()
+    upstream_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    upstream_socket.bind(("127.0.0.1", 0))
+    upstream_socket.listen(1)
+    upstream_port = upstream_socket.getsockname()[1]
+    threading.Thread(
+        target=run_upstream, args=(upstream_socket, stop_event, args.fps, args.payload_size), daemon=True
+    ).start()
+
+    listen_port = free_port()
+    http_port = free_port()
+    relay = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "stream_relay.py"),
+         "127.0.0.1", str(upstream_port), "--listen-host", "127.0.0.1",
+         "--listen-port", str(listen_port), "--http-port", str(http_port)],
+        stdout=subprocess.DEVNULL,
+    )
+    time.sleep(1.0)
+
+    tcp_stats = [ViewerStats(0.2 if i < args.slow_viewers else 0.0) for i in range(args.viewers)]
+    http_stats = [ViewerStats() for _ in range(args.http_viewers)]
+    for stats in tcp_stats:
+        threading.Thread(target=run_tcp_viewer, args=(listen_port, stats), daemon=True).start()
+    for stats in http_stats:
+        threading.Thread(target=run_http_viewer, args=(http_port, stats, stop_event), daemon=True).start()
+
+    time.sleep(args.duration)
+    stop_event.set()
+    relay.terminate()
+    relay.wait()
+    relay_cpu = resource.getrusage(resource.RUSAGE_CHILDREN)
+    relay_cpu_seconds = relay_cpu.ru_utime + relay_cpu.ru_stime
+
+    fast = tcp_stats[args.slow_viewers:]
+    slow = tcp_stats[:args.slow_viewers]
+    for label, group in (("fast tcp", fast), ("slow tcp", slow), ("http", http_stats)):
+        if not group:
+            continue
+        latencies = [latency * 1000 for stats in group for latency in stats.latencies]
+        received = sum(stats.received for stats in group)
+        missed = sum(stats.missed() for stats in group)
+        print(f"{label:>8}: viewers={len(group)} fps/viewer={received / len(group) / args.duration:.1f} "
+              f"dropped={100.0 * missed / max(1, received + missed):.1f}% "
+              f"p50={percentile(latencies, 50):.1f}ms p99={percentile(latencies, 99):.1f}ms")
+    print(f"relay cpu={100 * relay_cpu_seconds / (args.duration + 1):.1f}% "
+          f"(upstream {args.fps:.0f} fps x {args.payload_size // 1024} KB)")
+
+
+if __name__ == "__main__":
+    main()
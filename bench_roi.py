@@ -0,0 +1,79 @@
+"""
+Bytes/frame and encode time for full-frame 1080p versus region-of-interest
+streaming, using the server's own crop/scale/encode path.
+
+The synthetic scene is a gradient with shapes, text and mild sensor noise so
+JPEG sizes are in a realistic range. ROI rows include the crop/resize time.
+
+    python bench_roi.py --iterations 200
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from test_video_stream_server import apply_roi, make_overview
+
+
+def make_scene(width=1920, height=1080, seed=0):
+    rng = np.random.default_rng(seed)
+    xs = np.linspace(0, 1, width, dtype=np.float32)
+    ys = np.linspace(0, 1, height, dtype=np.float32)[:, None]
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[..., 0] = 60 + 120 * xs
+    frame[..., 1] = 40 + 150 * ys
+    frame[..., 2] = 90 + 80 * (xs * ys)
+    for _ in range(60):
+        center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        color = tuple(int(c) for c in rng.integers(0, 256, 3))
+        if rng.random() < 0.5:
+            cv2.circle(frame, center, int(rng.integers(10, 120)), color, -1)
+        else:
+            size = rng.integers(20, 200, 2)
+            cv2.rectangle(frame, center, (center[0] + int(size[0]), center[1] + int(size[1])), color, -1)
+    for i in range(40):
+        origin = (int(rng.integers(0, width - 300)), int(rng.integers(30, height)))
+        cv2.putText(frame, f"AIER-{i:03d}", origin, cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+    noise = rng.normal(0, 2, frame.shape)
+    return np.clip(frame + noise, 0, 255).astype(np.uint8)
+
+
+def measure(label, prepare, iterations):
+    sizes, times = [], []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        image = prepare()
+        _, encoded = cv2.imencode(".jpg", image)
+        times.append(time.perf_counter() - start)
+        sizes.append(len(encoded))
+    times.sort()
+    mean_bytes = sum(sizes) / len(sizes)
+    print(f"{label:<34} {image.shape[1]:>4}x{image.shape[0]:<4} {mean_bytes / 1024:8.1f} KiB/frame "
+          f"encode p50={times[len(times) // 2] * 1000:6.2f} ms")
+    return mean_bytes, times[len(times) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--overview-interval", type=int, default=10)
+    args = parser.parse_args()
+
+    frame = make_scene()
+    full_bytes, full_time = measure("full frame 1080p", lambda: frame, args.iterations)
+    roi = (640, 300, 640, 480, 640, 480)
+    roi_bytes, roi_time = measure("ROI 640x480 crop (native)", lambda: apply_roi(frame, roi), args.iterations)
+    measure("ROI 1280x960 crop -> 640x480", lambda: apply_roi(frame, (320, 60, 1280, 960, 640, 480)),
+            args.iterations)
+    overview_bytes, overview_time = measure("overview", lambda: make_overview(frame), args.iterations)
+
+    amortized_bytes = roi_bytes + overview_bytes / args.overview_interval
+    amortized_time = roi_time + overview_time / args.overview_interval
+    print(f"ROI + overview every {args.overview_interval} frames: {amortized_bytes / 1024:.1f} KiB/frame "
+          f"({100 * amortized_bytes / full_bytes:.0f}% of full frame), "
+          f"{amortized_time * 1000:.2f} ms/frame ({100 * amortized_time / full_time:.0f}% of full frame)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Handoff latency/CPU benchmark for the shared-memory frame ring.
+
+The main process publishes synthetic 640x480 BGR frames at a fixed rate and
+each subscriber process reads the latest frame as a zero-copy view. Latency is
+measured from the publish timestamp to the moment the subscriber holds the
+view; CPU is user+system time per process over the run.
+
+    python bench_shared_ring.py                   # 1 and 4 subscribers
+    python bench_shared_ring.py --subscribers 4 --duration 30
+"""
+import argparse
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from dev_support import percentile
+from networking_module import SharedFramePublisher, SharedFrameSubscriber
+
+
+def cpu_seconds():
+    times = os.times()
+    return times.user + times.system
+
+
+
+def run_subscriber(name, stop_event, results, poll_interval):
+    subscriber = SharedFrameSubscriber(name)
+    latencies = []
+    last_seq = 0
+    start_cpu = cpu_seconds()
+    while not stop_event.is_set():
+        frame = subscriber.wait_for_frame(last_seq, timeout=0.1, poll_interval=poll_interval)
+        if frame is None:
+            continue
+        latencies.append(time.time() - frame.timestamp)
+        # Touch the pixels so the view is actually used
+        _ = int(frame.data[0, 0, 0]) + int(frame.data[-1, -1, -1])
+        if not subscriber.is_valid(frame):
+            latencies.pop()
+        last_seq = frame.seq
+        del frame
+    results.put((latencies, cpu_seconds() - start_cpu))
+    subscriber.close()
+
+
+def run_benchmark(subscriber_count, duration, fps, poll_interval):
+    name = f"aier_bench_{os.getpid()}_{subscriber_count}"
+    publisher = SharedFramePublisher(name, slot_size=640 * 480 * 3, slot_count=4)
+    frames = [np.full((480, 640, 3), i, dtype=np.uint8) for i in range(8)]
+
+    stop_event = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=run_subscriber, args=(name, stop_event, results, poll_interval))
+        for _ in range(subscriber_count)
+    ]
+    for worker in workers:
+        worker.start()
+    time.sleep(0.5)
+
+    start_cpu = cpu_seconds()
+    interval = 1.0 / fps
+    next_publish = time.monotonic()
+    deadline = next_publish + duration
+    published = 0
+    while time.monotonic() < deadline:
+        publisher.publish_frame(frames[published % len(frames)])
+        published += 1
+        next_publish += interval
+        delay = next_publish - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    publisher_cpu = cpu_seconds() - start_cpu
+
+    stop_event.set()
+    collected = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    publisher.close()
+
+    latencies = [latency * 1e6 for worker_latencies, _ in collected for latency in worker_latencies]
+    subscriber_cpu = [cpu for _, cpu in collected]
+    received = sum(len(worker_latencies) for worker_latencies, _ in collected)
+    print(f"subscribers={subscriber_count} published={published} received={received} "
+          f"p50={percentile(latencies, 50):.0f}us p99={percentile(latencies, 99):.0f}us "
+          f"publisher_cpu={100 * publisher_cpu / duration:.1f}% "
+          f"subscriber_cpu_avg={100 * sum(subscriber_cpu) / len(subscriber_cpu) / duration:.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--poll-interval", type=float, default=0.0005)
+    args = parser.parse_args()
+
+    for count in args.subscribers:
+        run_benchmark(count, args.duration, args.fps, args.poll_interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Socket calls per frame and frame latency on loopback, before and after the
+shared transport layer.
+
+"before" is the previous path: two sendall calls per frame (header, then
+payload) on a socket with default options, and a client that issues one
+recv_into per header and per payload. "after" uses transport.send_frame
+(one sendmsg) with the low_latency profile and TCPClient's batched
+FrameReader. Socket calls are counted with a wrapper; each one is at least
+one syscall (a sendall on a large payload may take several).
+
+    python bench_transport.py --frames 2000 --payload-sizes 2048 65536
+"""
+import argparse
+import os
+import socket
+import threading
+import time
+from collections import Counter
+
+import transport
+from dev_support import percentile
+from networking_module import FRAME_SIZE_MASK, TCPClient, TIMESTAMPED_FRAME_HEADER, pack_frame_header
+
+
+HEADER = TIMESTAMPED_FRAME_HEADER
+
+
+class CountingSocket:
+    """Delegates to a real socket, counting I/O calls."""
+
+    COUNTED = ("send", "sendall", "sendmsg", "recv", "recv_into")
+
+    def __init__(self, sock):
+        self._sock = sock
+        self.counts = Counter()
+
+    def __getattr__(self, name):
+        attr = getattr(self._sock, name)
+        if name not in self.COUNTED:
+            return attr
+
+        def counted(*args, **kwargs):
+            self.counts[name] += 1
+            return attr(*args, **kwargs)
+
+        return counted
+
+
+
+def run_server(server_socket, mode, frames, payload_size, fps, result):
+    conn, _ = server_socket.accept()
+    if mode == "after":
+        transport.apply_socket_profile(conn, "low_latency")
+    conn = CountingSocket(conn)
+    payload = os.urandom(payload_size)
+    interval = 1.0 / fps
+    next_send = time.monotonic()
+    try:
+        for _ in range(frames):
+            header = pack_frame_header(len(payload), time.time())
+            if mode == "after":
+                transport.send_frame(conn, header, payload)
+            else:
+                conn.sendall(header)
+                conn.sendall(payload)
+            next_send += interval
+            delay = next_send - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+    finally:
+        result["server_calls"] = sum(conn.counts.values())
+        conn.close()
+        server_socket.close()
+
+
+def legacy_receive(sock, on_frame):
+    """The previous client loop: exact-size recv_into for header and payload."""
+    header = bytearray(HEADER.size)
+    payload = bytearray(64 * 1024)
+
+    def recv_exact(buffer, size):
+        view = memoryview(buffer)
+        received = 0
+        while received < size:
+            count = sock.recv_into(view[received:size], size - received)
+            if count == 0:
+                return False
+            received += count
+        return True
+
+    while recv_exact(header, HEADER.size):
+        frame_size, timestamp_us = HEADER.unpack(header)
+        frame_size &= FRAME_SIZE_MASK
+        if len(payload) < frame_size:
+            payload = bytearray(frame_size)
+        if not recv_exact(payload, frame_size):
+            return
+        on_frame(timestamp_us / 1e6)
+
+
+def run(mode, frames, payload_size, fps):
+    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if mode == "after":
+        transport.apply_socket_profile(server_socket, "low_latency")
+    server_socket.bind(("127.0.0.1", 0))
+    server_socket.listen(1)
+    result = {}
+    server = threading.Thread(
+        target=run_server, args=(server_socket, mode, frames, payload_size, fps, result), daemon=True
+    )
+    server.start()
+
+    latencies = []
+    client = TCPClient("127.0.0.1", server_socket.getsockname()[1],
+                       socket_profile="low_latency" if mode == "after" else "default")
+    client.connect()
+    client.socket = CountingSocket(client.socket)
+    if mode == "after":
+        for _, timestamp, _ in client.iter_frame_payloads():
+            latencies.append(time.time() - timestamp)
+    else:
+        legacy_receive(client.socket, lambda timestamp: latencies.append(time.time() - timestamp))
+    client_calls = sum(client.socket.counts.values())
+    server.join()
+    client.disconnect()
+
+    latencies = [latency * 1e6 for latency in latencies]
+    print(f"{mode:>6} payload={payload_size:>6}B frames={len(latencies)} "
+          f"server calls/frame={result['server_calls'] / frames:.2f} "
+          f"client calls/frame={client_calls / frames:.2f} "
+          f"latency p50={percentile(latencies, 50):.0f}us p99={percentile(latencies, 99):.0f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--fps", type=float, default=100)
+    parser.add_argument("--payload-sizes", type=int, nargs="+", default=[2048, 65536])
+    args = parser.parse_args()
+
+    for payload_size in args.payload_sizes:
+        for mode in ("before", "after"):
+            run(mode, args.frames, payload_size, args.fps)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,8 @@
 import socket
 import threading
-import cv2
 import struct
-import numpy as np
 from tkinter import Tk, Frame, Label, Button, Entry, StringVar, Text, DISABLED, NORMAL, END
 from tkinter import messagebox
-from PIL import Image, ImageTk
 import time
 import datetime
 
@@ -81,6 +78,10 @@ class TCPClient:
             print("Not connected to the server.")
             return
 
+        # Video dependencies are only loaded when a stream is started
+        import cv2
+        import numpy as np
+
         try:
             while True:
                 # Receive frame size (4 bytes)
@@ -214,6 +215,9 @@ class ClientControlApp:
         if not self.is_streaming:
             return
 
+        import cv2
+        from PIL import Image, ImageTk
+
         image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         image = Image.fromarray(image)
         image_tk = ImageTk.PhotoImage(image)
@@ -0,0 +1,99 @@
+"""
+Helpers shared by the benchmark scripts, the soak harness and the test scripts.
+
+cv2 and numpy are only imported by the helpers that need them, so scripts that
+measure startup or networking stay light.
+"""
+import os
+import resource
+import socket
+import sys
+import time
+
+from networking_module import pack_frame_header
+
+
+def percentile(values, pct):
+    """Return the `pct` percentile of `values` (nearest rank), or NaN if empty."""
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))]
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except OSError:
+        # ru_maxrss is the peak, in KB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_encoded_frames(count=30, size=(640, 480)):
+    """Pre-encode a short loop of moving-gradient JPEG frames."""
+    import cv2
+    import numpy as np
+
+    width, height = size
+    xs = np.arange(width, dtype=np.uint16)
+    ys = np.arange(height, dtype=np.uint16)[:, None]
+    frames = []
+    for i in range(count):
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        frame[..., 0] = (xs + i * 8) % 256
+        frame[..., 1] = (ys + i * 4) % 256
+        frame[..., 2] = (xs // 2 + ys // 2 + i * 2) % 256
+        frames.append(cv2.imencode(".jpg", frame)[1].tobytes())
+    return frames
+
+
+def run_synthetic_server(server_socket, fps, stop_event=None, duration=None, timestamped=False,
+                         size=(640, 480)):
+    """Serve encoded frames to one client until stopped, draining any control messages."""
+    frames = make_encoded_frames(size=size)
+    conn, _ = server_socket.accept()
+    interval = 1.0 / fps
+    deadline = time.monotonic() + duration if duration else None
+    next_send = time.monotonic()
+    i = 0
+    try:
+        while not (stop_event and stop_event.is_set()) and not (deadline and time.monotonic() >= deadline):
+            data = frames[i % len(frames)]
+            conn.settimeout(None)
+            conn.sendall(pack_frame_header(len(data), time.time() if timestamped else None) + data)
+            conn.settimeout(0)
+            try:
+                while conn.recv(4096):
+                    pass
+            except (BlockingIOError, socket.timeout):
+                pass
+            i += 1
+            next_send += interval
+            delay = next_send - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_send = time.monotonic()
+    except OSError:
+        pass
+    finally:
+        conn.close()
+        server_socket.close()
+
+
+def run_tests(namespace):
+    """Run the `test_*` functions in `namespace` (a module's globals()) and exit with their status."""
+    failed = False
+    for name, test in sorted(namespace.items()):
+        if not name.startswith("test_") or not callable(test):
+            continue
+        try:
+            test()
+            print(f"PASS {name}")
+        except AssertionError as e:
+            failed = True
+            print(f"FAIL {name}: {e}")
+    sys.exit(1 if failed else 0)
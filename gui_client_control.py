@@ -1,10 +1,7 @@
 import threading
-from PIL import Image, ImageTk
-import numpy as np
-import cv2
 import tkinter as tk
 from tkinter import messagebox
-from networking_module import TCPClient
+from networking_module import TCPClient, PlayoutBuffer
 import time
 import datetime
 
@@ -21,13 +18,23 @@ class ClientControlApp:
         self.video_stream_thread = None
         self.is_streaming = False
         self.video_writer = None
+        self.video_writer_size = (640, 480)
         self.crosshair_position = None
         self.last_frame_times = []  # For stable FPS calculation
         self.fps_label = None
 
+        # Reused as cv2 dst arrays on the display and recording paths
+        self.rgb_frame = None
+        self.record_frame = None
+        self.photo_image = None
+
         # Add a BooleanVar for "calibrate" if you need keyboard calibration
         self.calibrate_var = tk.BooleanVar(value=False)
 
+        # Streams can be paced through a playout buffer (using sender timestamps when present)
+        self.smooth_playout_var = tk.BooleanVar(value=False)
+        self.playout_buffer = None
+
         # Create the main frames
         self.create_main_frames()
 
@@ -133,6 +140,9 @@ class ClientControlApp:
         calibrate_check = tk.Checkbutton(self.left_frame, text="Calibrate", variable=self.calibrate_var)
         calibrate_check.grid(row=row_idx, column=4, padx=5, pady=2)
 
+        smooth_playout_check = tk.Checkbutton(self.left_frame, text="Smooth Playout", variable=self.smooth_playout_var)
+        smooth_playout_check.grid(row=row_idx, column=5, padx=5, pady=2)
+
         # Row 5: Crosshair Controls
         row_idx += 1
         tk.Label(self.left_frame, text="Crosshair Controls:").grid(row=row_idx, column=0, padx=5, pady=5, sticky="w")
@@ -225,11 +235,18 @@ class ClientControlApp:
         self.crosshair_position = [320, 240]  # Center of a 640x480 frame
         self.last_frame_times = []  # Clear FPS tracking
 
-        # Start the video stream in a separate thread
+        # Start the video stream in a separate thread, optionally paced by the playout buffer
         self.is_streaming = True
-        self.video_stream_thread = threading.Thread(
-            target=self.client.receive_video_stream, args=(self.update_video_frame,)
-        )
+        if self.smooth_playout_var.get():
+            self.playout_buffer = PlayoutBuffer(self.update_video_frame)
+            self.playout_buffer.start()
+            self.video_stream_thread = threading.Thread(
+                target=self.client.receive_video_stream, args=(self.playout_buffer.push, True)
+            )
+        else:
+            self.video_stream_thread = threading.Thread(
+                target=self.client.receive_video_stream, args=(self.update_video_frame,)
+            )
         self.video_stream_thread.daemon = True
         self.video_stream_thread.start()
 
@@ -238,6 +255,15 @@ class ClientControlApp:
         self.start_video_button.config(state=tk.NORMAL)
         self.is_streaming = False
 
+        if self.playout_buffer:
+            stats = self.playout_buffer.stats()
+            self.log(
+                f"Playout: jitter {stats['jitter_ms']:.1f} ms, delay {stats['delay_ms']:.1f} ms, "
+                f"dropped {stats['dropped']}, late {stats['late']}"
+            )
+            self.playout_buffer.stop()
+            self.playout_buffer = None
+
         if self.video_stream_thread and self.video_stream_thread.is_alive():
             self.video_stream_thread.join(timeout=1)
 
@@ -245,6 +271,10 @@ class ClientControlApp:
         if not self.is_streaming:
             return
 
+        # Video dependencies are only loaded once frames arrive
+        import cv2
+        from PIL import Image, ImageTk
+
         # Calculate stable FPS using a sliding window of frame times
         current_time = time.time()
         self.last_frame_times.append(current_time)
@@ -261,27 +291,45 @@ class ClientControlApp:
             cv2.line(frame, (x - 20, y), (x + 20, y), (0, 0, 255), 2)
             cv2.line(frame, (x, y - 20), (x, y + 20), (0, 0, 255), 2)
 
-        # Convert the OpenCV frame to a format compatible with Tkinter
-        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        image = Image.fromarray(image)
-        image_tk = ImageTk.PhotoImage(image)
+        # Convert the OpenCV frame for Tkinter, reusing the RGB array
+        # (cv2 allocates a new one if the frame size changes)
+        self.rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.rgb_frame)
+        image = Image.fromarray(self.rgb_frame)
 
-        # Update the video label
-        self.video_label.config(image=image_tk)
-        self.video_label.image = image_tk
+        # Paste into the existing PhotoImage when the size is unchanged;
+        # both paths copy the pixels, so the RGB array is free again afterwards
+        if self.photo_image is not None and (self.photo_image.width(), self.photo_image.height()) == image.size:
+            self.photo_image.paste(image)
+        else:
+            self.photo_image = ImageTk.PhotoImage(image)
+            self.video_label.config(image=self.photo_image)
+            self.video_label.image = self.photo_image
 
         # Save the frame if video saving is active
         if self.video_writer:
+            self.write_video_frame(frame)
+
+    def write_video_frame(self, frame):
+        """Write a frame to the recorder, resizing into a reused array if needed."""
+        import cv2
+
+        width, height = self.video_writer_size
+        if frame.shape[:2] == (height, width):
             self.video_writer.write(frame)
+            return
+        self.record_frame = cv2.resize(frame, (width, height), dst=self.record_frame)
+        self.video_writer.write(self.record_frame)
 
     # --------------------------------------------------------------------------
     # Video Recording
     # --------------------------------------------------------------------------
     def start_saving_video(self):
         if self.video_writer is None:
+            import cv2
+
             fourcc = cv2.VideoWriter_fourcc(*"XVID")
             filename = datetime.datetime.now().strftime("video_%Y%m%d_%H%M%S.avi")
-            self.video_writer = cv2.VideoWriter(filename, fourcc, 20.0, (640, 480))
+            self.video_writer = cv2.VideoWriter(filename, fourcc, 20.0, self.video_writer_size)
             self.log(f"Started saving video to {filename}.")
             self.save_video_button.config(state=tk.DISABLED)
             self.stop_saving_button.config(state=tk.NORMAL)
@@ -1,14 +1,53 @@
 import socket
 import threading
-import cv2
 import struct
-import numpy as np
+import sys
+import time
+from collections import deque, namedtuple
+
+from transport import MAX_FRAME_SIZE, FrameReader, apply_socket_profile
+
+# Only the standard library is imported here so control-only clients start
+# fast. cv2, numpy and shared memory support are imported on first use by the
+# video helpers below.
+
+
+# Video frames are length-prefixed. The top bits of the size word are flags,
+# so every header describes itself and clients need no format setting:
+# - TIMESTAMP_FLAG: the capture time, in microseconds since the epoch,
+#   follows the size word (servers started with timestamps enabled).
+# - OVERVIEW_FLAG: a low-resolution overview frame sent alongside the cropped
+#   stream while a region of interest is active.
+FRAME_HEADER = struct.Struct(">L")
+TIMESTAMPED_FRAME_HEADER = struct.Struct(">LQ")
+TIMESTAMP_FIELD = struct.Struct(">Q")
+OVERVIEW_FLAG = 0x80000000
+TIMESTAMP_FLAG = 0x40000000
+FRAME_SIZE_MASK = 0x3FFFFFFF
+
+
+def pack_frame_header(frame_size, timestamp=None, overview=False):
+    """Build a frame header; pass `timestamp` (seconds) to include the capture time."""
+    if overview:
+        frame_size |= OVERVIEW_FLAG
+    if timestamp is None:
+        return FRAME_HEADER.pack(frame_size)
+    return TIMESTAMPED_FRAME_HEADER.pack(frame_size | TIMESTAMP_FLAG, round(timestamp * 1e6))
+
+
+def frame_header_size(size_word):
+    """Return the length of the header whose first word is `size_word`."""
+    return TIMESTAMPED_FRAME_HEADER.size if size_word & TIMESTAMP_FLAG else FRAME_HEADER.size
 
 
 class TCPClient:
-    def __init__(self, server_address, server_port):
+    def __init__(self, server_address, server_port, socket_profile="low_latency", max_frame_size=MAX_FRAME_SIZE):
         self.server_address = server_address
         self.server_port = server_port
+        self.max_frame_size = max_frame_size
+        # Whether the last received frame carried the sender's capture time
+        self.sender_timestamps = False
+        self.socket_profile = socket_profile
         self.socket = None
         self.is_connected = False
 
@@ -16,6 +55,7 @@ class TCPClient:
         """Establish a connection to the server."""
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            apply_socket_profile(self.socket, self.socket_profile)
             self.socket.connect((self.server_address, self.server_port))
             self.is_connected = True
             print(f"Connected to server at {self.server_address}:{self.server_port}")
@@ -74,33 +114,413 @@ class TCPClient:
             self.is_connected = False
             print("Disconnected from the server.")
 
-    def receive_video_stream(self, display_callback):
+    def request_roi(self, x, y, width, height, output_width, output_height, overview_interval=10):
+        """Ask the server to stream a crop (in sensor pixels) scaled to the output size."""
+        # The server also sends a low-resolution overview every overview_interval frames
+        self.send_data(
+            f"ROI:{x},{y},{width},{height},{output_width},{output_height},{overview_interval}\n".encode()
+        )
+
+    def clear_roi(self):
+        """Go back to streaming the full frame."""
+        self.send_data(b"ROI:OFF\n")
+
+    def iter_frame_payloads(self):
+        """Yield `(payload, timestamp, is_overview)` for each received frame."""
+        # Payloads are memoryviews into the batched read buffer, valid only until
+        # the next frame. Frames over max_frame_size raise ValueError before
+        # anything is allocated.
+        reader = FrameReader(self.socket, max_size=self.max_frame_size)
+        while True:
+            # Receive frame size and flags, then the capture time if present
+            header = reader.read_exact(FRAME_HEADER.size)
+            if header is None:
+                return
+            size_word = FRAME_HEADER.unpack(header)[0]
+            self.sender_timestamps = bool(size_word & TIMESTAMP_FLAG)
+            if self.sender_timestamps:
+                field = reader.read_exact(TIMESTAMP_FIELD.size)
+                if field is None:
+                    return
+                timestamp = TIMESTAMP_FIELD.unpack(field)[0] / 1e6
+            else:
+                # No capture time from the sender: use the arrival time
+                timestamp = time.time()
+            is_overview = bool(size_word & OVERVIEW_FLAG)
+            frame_size = size_word & FRAME_SIZE_MASK
+
+            # Receive frame data
+            payload = reader.read_exact(frame_size)
+            if payload is None:
+                return
+            yield payload, timestamp, is_overview
+
+    def receive_raw_stream(self, payload_callback, pass_timestamp=False, overview_callback=None):
+        """Receive encoded frames and pass the undecoded payloads to the callback."""
+        if not self.is_connected:
+            print("Not connected to the server.")
+            return
+
+        try:
+            for payload, timestamp, is_overview in self.iter_frame_payloads():
+                # Overview frames go to overview_callback, or are dropped without one
+                if is_overview:
+                    if overview_callback is None:
+                        continue
+                    callback = overview_callback
+                else:
+                    callback = payload_callback
+                if pass_timestamp:
+                    callback(payload, timestamp)
+                else:
+                    callback(payload)
+        except Exception as e:
+            print(f"Error receiving video stream: {e}")
+
+    def receive_video_stream(self, display_callback, pass_timestamp=False, overview_callback=None):
         """Receive video frames and call the display callback."""
         if not self.is_connected:
             print("Not connected to the server.")
             return
 
+        import cv2
+        import numpy as np
+
         try:
-            while True:
-                # Receive frame size
-                packed_size = self.socket.recv(4)
-                if not packed_size:
-                    break
-                frame_size = struct.unpack(">L", packed_size)[0]
-
-                # Receive frame data
-                frame_data = b""
-                while len(frame_data) < frame_size:
-                    frame_data += self.socket.recv(frame_size - len(frame_data))
+            for payload, timestamp, is_overview in self.iter_frame_payloads():
+                # Overview frames go to overview_callback, or are dropped without one
+                if is_overview:
+                    if overview_callback is None:
+                        continue
+                    callback = overview_callback
+                else:
+                    callback = display_callback
 
                 # Decode and display the frame
-                frame = cv2.imdecode(np.frombuffer(frame_data, dtype=np.uint8), cv2.IMREAD_COLOR)
-                if frame is not None:
-                    display_callback(frame)
+                frame = cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if frame is None:
+                    continue
+                if pass_timestamp:
+                    callback(frame, timestamp)
+                else:
+                    callback(frame)
         except Exception as e:
             print(f"Error receiving video stream: {e}")
 
 
+class PlayoutBuffer:
+    """Pace decoded frames for display using sender timestamps (pass_timestamp=True)."""
+
+    def __init__(self, display_callback, min_delay=0.02, max_delay=0.08, max_latency=0.3,
+                 delay_percentile=95, delay_decay=0.0005, transit_window=300, max_frames=8):
+        self.display_callback = display_callback
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.max_latency = max_latency
+        self.delay_percentile = delay_percentile
+        self.delay_decay = delay_decay
+        self.max_frames = max_frames
+
+        self.frames = deque()
+        self.condition = threading.Condition()
+        self.is_running = False
+        self.thread = None
+
+        # Jitter statistics
+        self.transits = deque(maxlen=transit_window)
+        self.last_transit = None
+        self.jitter = 0.0
+        self.delay = min_delay
+        self.latest_frame_mode = False
+        self.received = 0
+        self.displayed = 0
+        self.dropped = 0
+        self.late = 0
+        self.last_display_time = None
+        self.display_intervals = deque(maxlen=300)
+
+    def start(self):
+        self.is_running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.is_running = False
+            self.frames.clear()
+            self.condition.notify()
+        if self.thread and self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1)
+
+    def push(self, frame, timestamp):
+        """Queue a frame captured at `timestamp` (seconds since the epoch)."""
+        if not self.is_running:
+            # The receive thread may still deliver frames after stop()
+            self.dropped += 1
+            return
+        # Without sender timestamps the transit is constant, so frames simply
+        # wait min_delay. Smoothed jitter (RFC 3550 style) is only reported.
+        now = time.time()
+        transit = now - timestamp
+        if self.last_transit is not None:
+            self.jitter += (abs(transit - self.last_transit) - self.jitter) / 16.0
+        self.last_transit = transit
+        self.transits.append(transit)
+        # Schedule at capture time + best recent transit + delay, where the delay
+        # is the delay_percentile of recent excess transit, clamped to
+        # [min_delay, max_delay]
+        ordered = sorted(self.transits)
+        base_transit = ordered[0]
+        excess = ordered[int(self.delay_percentile / 100.0 * (len(ordered) - 1))] - base_transit
+        target = min(self.max_delay, max(self.min_delay, excess))
+        # Grow at once to absorb a burst, shrink slowly so playout doesn't lurch
+        self.delay = target if target > self.delay else max(target, self.delay - self.delay_decay)
+
+        with self.condition:
+            self.received += 1
+            # Far behind the best transit: drop the queue and show this frame now
+            self.latest_frame_mode = transit - base_transit > self.max_latency
+            if self.latest_frame_mode:
+                self.dropped += len(self.frames)
+                self.frames.clear()
+                playout_time = now
+            else:
+                playout_time = timestamp + base_transit + self.delay
+                if self.frames and playout_time < self.frames[-1][0]:
+                    playout_time = self.frames[-1][0]
+            self.frames.append((playout_time, frame))
+            # A slow display callback must not let frames pile up
+            while len(self.frames) > self.max_frames:
+                self.frames.popleft()
+                self.dropped += 1
+            self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.is_running and not self.frames:
+                    self.condition.wait()
+                if not self.is_running:
+                    return
+                playout_time, frame = self.frames[0]
+                wait = playout_time - time.time()
+                if wait > 0:
+                    # A newer push may reschedule or clear the queue; re-check after waking
+                    self.condition.wait(wait)
+                    continue
+                self.frames.popleft()
+                if wait < -self.min_delay:
+                    self.late += 1
+
+            now = time.monotonic()
+            if self.last_display_time is not None:
+                self.display_intervals.append(now - self.last_display_time)
+            self.last_display_time = now
+            self.displayed += 1
+            self.display_callback(frame)
+
+    def stats(self):
+        """Return a dict of jitter/delay statistics (times in milliseconds)."""
+        intervals = list(self.display_intervals)
+        if len(intervals) > 1:
+            mean = sum(intervals) / len(intervals)
+            variance = sum((i - mean) ** 2 for i in intervals) / (len(intervals) - 1)
+        else:
+            mean = variance = 0.0
+        return {
+            "jitter_ms": self.jitter * 1000,
+            "delay_ms": self.delay * 1000,
+            "queued": len(self.frames),
+            "received": self.received,
+            "displayed": self.displayed,
+            "dropped": self.dropped,
+            "late": self.late,
+            "latest_frame_mode": self.latest_frame_mode,
+            "display_interval_ms": mean * 1000,
+            "display_interval_var_ms2": variance * 1e6,
+        }
+
+
+# --------------------------------------------------------------------------
+# Shared-memory frame ring
+# --------------------------------------------------------------------------
+# Layout: one ring header followed by `slot_count` slots, each made of a slot
+# header and `slot_size` bytes of frame data. A slot's sequence number is
+# zeroed while it is being written, so readers can detect torn frames by
+# checking that the sequence number is unchanged after reading.
+RING_MAGIC = b"AIER"
+RING_HEADER = struct.Struct("<4sIIQ")  # magic, slot_count, slot_size, latest_seq
+SLOT_HEADER = struct.Struct("<QdIIIIB")  # seq, timestamp, nbytes, height, width, channels, kind
+RING_HEADER_SIZE = 64
+SLOT_HEADER_SIZE = 64
+
+FRAME_KIND_DECODED = 0
+FRAME_KIND_JPEG = 1
+
+SharedFrame = namedtuple("SharedFrame", ["seq", "timestamp", "kind", "data"])
+
+
+def _slot_offset(slot_index, slot_size):
+    return RING_HEADER_SIZE + slot_index * (SLOT_HEADER_SIZE + slot_size)
+
+
+def _attach_shared_memory(name):
+    """Attach to an existing block without registering it with the resource tracker.
+
+    The publisher owns the block; a tracked attach would unlink it when this
+    process exits (or unregister the publisher's entry if the tracker is shared).
+    """
+    from multiprocessing import resource_tracker, shared_memory
+
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class SharedFramePublisher:
+    """Publish frames into a shared-memory ring for local consumer processes.
+
+    Decoded frames (`publish_frame`) or raw JPEG payloads (`publish_payload`)
+    are copied into the next slot together with a sequence number and a
+    `time.time()` timestamp. Frames larger than `slot_size` are dropped.
+    """
+
+    def __init__(self, name, slot_size=1920 * 1080 * 3, slot_count=4):
+        from multiprocessing import shared_memory
+
+        self.name = name
+        self.slot_size = slot_size
+        self.slot_count = slot_count
+        self.seq = 0
+        total_size = _slot_offset(slot_count, slot_size)
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=total_size)
+        RING_HEADER.pack_into(self.shm.buf, 0, RING_MAGIC, slot_count, slot_size, 0)
+
+    def publish_frame(self, frame):
+        """Copy a decoded (height, width[, channels]) uint8 frame into the ring."""
+        import numpy as np
+
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        data = np.ascontiguousarray(frame, dtype=np.uint8)
+        return self._write(FRAME_KIND_DECODED, memoryview(data).cast("B"), height, width, channels)
+
+    def publish_payload(self, payload):
+        """Copy an encoded JPEG payload into the ring without decoding it."""
+        return self._write(FRAME_KIND_JPEG, memoryview(payload).cast("B"), 0, 0, 0)
+
+    def wrap(self, display_callback=None):
+        """Return a display callback that publishes each frame before forwarding it."""
+        def callback(frame):
+            self.publish_frame(frame)
+            if display_callback:
+                display_callback(frame)
+        return callback
+
+    def _write(self, kind, data, height, width, channels):
+        nbytes = data.nbytes
+        if nbytes > self.slot_size:
+            print(f"Frame of {nbytes} bytes does not fit in a {self.slot_size} byte slot. Dropping.")
+            return None
+
+        seq = self.seq + 1
+        offset = _slot_offset(seq % self.slot_count, self.slot_size)
+        buf = self.shm.buf
+
+        # Invalidate the slot, copy the data, then publish the new sequence number
+        SLOT_HEADER.pack_into(buf, offset, 0, 0.0, 0, 0, 0, 0, 0)
+        data_offset = offset + SLOT_HEADER_SIZE
+        buf[data_offset:data_offset + nbytes] = data
+        SLOT_HEADER.pack_into(buf, offset, seq, time.time(), nbytes, height, width, channels, kind)
+        struct.pack_into("<Q", buf, RING_HEADER.size - 8, seq)
+        self.seq = seq
+        return seq
+
+    def close(self):
+        """Release and remove the shared-memory block."""
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SharedFrameSubscriber:
+    """Read the latest frame from a SharedFramePublisher ring as a NumPy view.
+
+    The returned arrays alias shared memory: they stay valid until the
+    publisher wraps around to the same slot (`slot_count - 1` newer frames).
+    Use `is_valid()` after processing to detect an overwrite, or pass
+    `copy=True` to `read_latest()` to take a private copy. Drop all views
+    before calling `close()`.
+    """
+
+    def __init__(self, name):
+        self.shm = _attach_shared_memory(name)
+        magic, self.slot_count, self.slot_size, _ = RING_HEADER.unpack_from(self.shm.buf, 0)
+        if magic != RING_MAGIC:
+            self.shm.close()
+            raise ValueError(f"Shared memory block {name!r} is not a frame ring.")
+
+    def latest_seq(self):
+        """Sequence number of the most recently published frame (0 if none)."""
+        return struct.unpack_from("<Q", self.shm.buf, RING_HEADER.size - 8)[0]
+
+    def _slot_seq(self, seq):
+        return struct.unpack_from("<Q", self.shm.buf, _slot_offset(seq % self.slot_count, self.slot_size))[0]
+
+    def read_latest(self, copy=False, retries=3):
+        """Return the newest frame as a SharedFrame, or None if nothing is available."""
+        import numpy as np
+
+        buf = self.shm.buf
+        for _ in range(retries):
+            seq = self.latest_seq()
+            if seq == 0:
+                return None
+
+            offset = _slot_offset(seq % self.slot_count, self.slot_size)
+            slot_seq, timestamp, nbytes, height, width, channels, kind = SLOT_HEADER.unpack_from(buf, offset)
+            if slot_seq != seq:
+                continue
+
+            if kind == FRAME_KIND_DECODED:
+                shape = (height, width, channels) if channels > 1 else (height, width)
+            else:
+                shape = (nbytes,)
+            data = np.ndarray(shape, dtype=np.uint8, buffer=buf, offset=offset + SLOT_HEADER_SIZE)
+            if copy:
+                data = data.copy()
+            else:
+                data.flags.writeable = False
+
+            if self._slot_seq(seq) == seq:
+                return SharedFrame(seq, timestamp, kind, data)
+        return None
+
+    def wait_for_frame(self, last_seq=0, timeout=1.0, poll_interval=0.0005, copy=False):
+        """Poll until a frame newer than `last_seq` is published or the timeout expires."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.latest_seq() > last_seq:
+                frame = self.read_latest(copy=copy)
+                if frame is not None and frame.seq > last_seq:
+                    return frame
+            time.sleep(poll_interval)
+        return None
+
+    def is_valid(self, frame):
+        """Return True if `frame`'s slot has not been overwritten since it was read."""
+        return self._slot_seq(frame.seq) == frame.seq
+
+    def close(self):
+        """Detach from the shared-memory block."""
+        self.shm.close()
+
+
 # Example Usage
 if __name__ == "__main__":
     # Replace with actual server address and port
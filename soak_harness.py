@@ -0,0 +1,315 @@
+"""
+Long-running soak test for ClientControlApp and TCPClient.
+
+Starts a synthetic local video server (timestamped JPEG frames at an
+accelerated rate), connects a ClientControlApp to it and streams for hours
+while simulating operator activity (state changes and crosshair moves, which
+write to the log). Every sample interval it records RSS, traced Python memory,
+thread count, displayed fps and capture-to-display latency; at the end it
+prints a compact time series, the top tracemalloc growth sites since warm-up,
+and fails (exit code 1) when growth or decay exceeds the thresholds.
+
+Uses the real Tk when a display is available (e.g. under `xvfb-run`), and a
+headless Tk stub otherwise.
+
+    python soak_harness.py --duration 7200 --fps 120
+    python soak_harness.py --duration 120 --sample-interval 10 --headless
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import tracemalloc
+import types
+
+from dev_support import current_rss_mb, run_synthetic_server
+
+
+# --------------------------------------------------------------------------
+# Headless Tk stub
+# --------------------------------------------------------------------------
+class _StubVar:
+    def __init__(self, master=None, value=None):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class _StubWidget:
+    """Accepts any widget call; Entry/Text keep their contents like the real ones."""
+
+    def __init__(self, *args, **kwargs):
+        self.options = dict(kwargs)
+        self.contents = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+    def config(self, **kwargs):
+        self.options.update(kwargs)
+
+    configure = config
+
+    def insert(self, index, text):
+        self.contents.append(text)
+
+    def delete(self, first, last=None):
+        self.contents = []
+
+    def get(self, *args):
+        return "".join(self.contents)
+
+
+class _StubPhotoImage:
+    """Stands in for ImageTk.PhotoImage; keeps the pixels like Tk would."""
+
+    def __init__(self, image=None, **kwargs):
+        self.size = image.size
+        self.pixels = image.tobytes()
+
+    def width(self):
+        return self.size[0]
+
+    def height(self):
+        return self.size[1]
+
+    def paste(self, image):
+        self.pixels = image.tobytes()
+
+
+def install_headless_tk(gui_module):
+    """Swap the tkinter widgets used by gui_client_control for stubs."""
+    stub_tk = types.SimpleNamespace(
+        Frame=_StubWidget, Label=_StubWidget, Entry=_StubWidget, Button=_StubWidget,
+        OptionMenu=_StubWidget, Checkbutton=_StubWidget, Text=_StubWidget,
+        StringVar=_StubVar, BooleanVar=_StubVar,
+        DISABLED="disabled", NORMAL="normal", END="end",
+    )
+    gui_module.tk = stub_tk
+    gui_module.messagebox = types.SimpleNamespace(
+        showerror=lambda *args: print(f"[messagebox] {args}"),
+        showwarning=lambda *args: print(f"[messagebox] {args}"),
+    )
+    from PIL import ImageTk
+    ImageTk.PhotoImage = _StubPhotoImage
+    return _StubWidget()
+
+
+# --------------------------------------------------------------------------
+# Instrumentation
+# --------------------------------------------------------------------------
+class FrameProbe:
+    """Wraps the app's display callback to count frames and measure latency."""
+
+    def __init__(self, app):
+        self.lock = threading.Lock()
+        self.frames = 0
+        self.latencies = []
+        self.last_timestamp = None
+
+        display = app.update_video_frame
+
+        def update_video_frame(frame):
+            display(frame)
+            with self.lock:
+                self.frames += 1
+                if self.last_timestamp is not None:
+                    self.latencies.append(time.time() - self.last_timestamp)
+
+        app.update_video_frame = update_video_frame
+
+        payloads = app.client.iter_frame_payloads
+
+        def iter_frame_payloads():
+            for payload, timestamp, is_overview in payloads():
+                self.last_timestamp = timestamp
+                yield payload, timestamp, is_overview
+
+        app.client.iter_frame_payloads = iter_frame_payloads
+
+    def take(self):
+        """Return (frames, latencies) since the last call."""
+        with self.lock:
+            frames, latencies = self.frames, self.latencies
+            self.frames, self.latencies = 0, []
+        return frames, latencies
+
+
+def take_sample(start, probe, last_sample_time):
+    now = time.monotonic()
+    frames, latencies = probe.take()
+    latencies.sort()
+    traced, _ = tracemalloc.get_traced_memory()
+    return {
+        "t": now - start,
+        "rss_mb": current_rss_mb(),
+        "traced_mb": traced / (1024 * 1024),
+        "threads": threading.active_count(),
+        "fps": frames / max(1e-6, now - last_sample_time),
+        "latency_p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else float("nan"),
+        "latency_p99_ms": latencies[int(0.99 * (len(latencies) - 1))] * 1000 if latencies else float("nan"),
+    }, now
+
+
+def evaluate(samples, warmup_index, args):
+    """Return a list of threshold violations comparing post-warm-up samples."""
+    baseline = samples[warmup_index]
+    window = max(1, len(samples[warmup_index:]) // 5)
+    early = samples[warmup_index:warmup_index + window]
+    late = samples[-window:]
+
+    def mean(rows, key):
+        values = [row[key] for row in rows if row[key] == row[key]]
+        return sum(values) / len(values) if values else float("nan")
+
+    failures = []
+    rss_growth = samples[-1]["rss_mb"] - baseline["rss_mb"]
+    if rss_growth > args.max_rss_growth_mb:
+        failures.append(f"RSS grew {rss_growth:.1f} MB after warm-up (limit {args.max_rss_growth_mb} MB)")
+    thread_growth = samples[-1]["threads"] - baseline["threads"]
+    if thread_growth > args.max_thread_growth:
+        failures.append(f"thread count grew by {thread_growth} (limit {args.max_thread_growth})")
+    early_fps, late_fps = mean(early, "fps"), mean(late, "fps")
+    if early_fps > 0 and late_fps < early_fps * (1 - args.max_fps_decay):
+        failures.append(f"fps decayed from {early_fps:.1f} to {late_fps:.1f} (limit {args.max_fps_decay:.0%})")
+    early_latency, late_latency = mean(early, "latency_p50_ms"), mean(late, "latency_p50_ms")
+    if late_latency - early_latency > args.max_latency_growth_ms:
+        failures.append(
+            f"p50 latency grew from {early_latency:.1f} ms to {late_latency:.1f} ms "
+            f"(limit +{args.max_latency_growth_ms} ms)"
+        )
+    return failures
+
+
+def print_report(samples, top_stats, failures):
+    print(f"{'t[s]':>8} {'rss[MB]':>8} {'py[MB]':>7} {'thr':>4} {'fps':>7} {'p50[ms]':>8} {'p99[ms]':>8}")
+    for row in samples:
+        print(f"{row['t']:8.0f} {row['rss_mb']:8.1f} {row['traced_mb']:7.2f} {row['threads']:4d} "
+              f"{row['fps']:7.1f} {row['latency_p50_ms']:8.1f} {row['latency_p99_ms']:8.1f}")
+    print("Top allocation growth since warm-up:")
+    for stat in top_stats:
+        print(f"  {stat.size_diff / 1024:+9.1f} KiB {stat.count_diff:+7d} blocks  {stat.traceback.format()[-1].strip()}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("PASS")
+
+
+# --------------------------------------------------------------------------
+# Main
+# --------------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=7200, help="seconds")
+    parser.add_argument("--fps", type=float, default=120, help="synthetic server frame rate")
+    parser.add_argument("--sample-interval", type=float, default=60)
+    parser.add_argument("--warmup", type=float, default=None, help="seconds ignored for thresholds (default 10%%)")
+    parser.add_argument("--activity-interval", type=float, default=1.0, help="seconds between simulated operator actions")
+    parser.add_argument("--headless", action="store_true", help="use the Tk stub even if a display is available")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=50)
+    parser.add_argument("--max-thread-growth", type=int, default=2)
+    parser.add_argument("--max-fps-decay", type=float, default=0.2)
+    parser.add_argument("--max-latency-growth-ms", type=float, default=100)
+    parser.add_argument("--json", help="also write the samples and result to this file")
+    args = parser.parse_args()
+    warmup = args.warmup if args.warmup is not None else args.duration * 0.1
+
+    import gui_client_control
+
+    tracemalloc.start(10)
+    headless = args.headless or not os.environ.get("DISPLAY")
+    root = install_headless_tk(gui_client_control) if headless else gui_client_control.tk.Tk()
+
+    stop_event = threading.Event()
+    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server_socket.bind(("127.0.0.1", 0))
+    server_socket.listen(1)
+    port = server_socket.getsockname()[1]
+    threading.Thread(target=run_synthetic_server, args=(server_socket, args.fps, stop_event),
+                     kwargs={"timestamped": True}, daemon=True).start()
+
+    app = gui_client_control.ClientControlApp(root)
+    app.server_address_entry.delete(0, "end")
+    app.server_address_entry.insert(0, "127.0.0.1")
+    app.server_port_entry.delete(0, "end")
+    app.server_port_entry.insert(0, str(port))
+    app.connect_to_server()
+    if not app.client or not app.client.is_connected:
+        print("FAIL: could not connect to the synthetic server")
+        sys.exit(1)
+    probe = FrameProbe(app)
+    app.start_video_stream()
+
+    samples = []
+    result = {}
+
+    def soak():
+        start = time.monotonic()
+        last_sample = last_activity = start
+        warmup_snapshot = None
+        step = 0
+        while time.monotonic() - start < args.duration:
+            time.sleep(min(args.activity_interval, args.sample_interval))
+            now = time.monotonic()
+            if now - last_activity >= args.activity_interval:
+                # Operator activity: every action writes to the log widget
+                step += 1
+                app.move_crosshair(1 if step % 2 else -1, 0)
+                if step % 10 == 0:
+                    app.send_state()
+                last_activity = now
+            if now - last_sample >= args.sample_interval:
+                sample, last_sample = take_sample(start, probe, last_sample)
+                samples.append(sample)
+                # Lazy imports (cv2, PIL) load with the first frame, so the
+                # baseline waits until frames are flowing
+                if warmup_snapshot is None and sample["t"] >= warmup and sample["fps"] > 0:
+                    warmup_snapshot = tracemalloc.take_snapshot()
+                    result["warmup_index"] = len(samples) - 1
+        result["top_stats"] = (
+            tracemalloc.take_snapshot().compare_to(warmup_snapshot, "lineno")[:10] if warmup_snapshot else []
+        )
+
+    if headless:
+        soak()
+    else:
+        worker = threading.Thread(target=soak, daemon=True)
+        worker.start()
+
+        def check_done():
+            if worker.is_alive():
+                root.after(500, check_done)
+            else:
+                root.quit()
+
+        root.after(500, check_done)
+        root.mainloop()
+
+    app.stop_video_stream()
+    app.disconnect_from_server()
+    stop_event.set()
+
+    if len(samples) < 2:
+        print("FAIL: not enough samples; increase --duration or lower --sample-interval")
+        sys.exit(1)
+    if "warmup_index" not in result:
+        print("FAIL: no frames were displayed after warm-up")
+        sys.exit(1)
+    warmup_index = min(result["warmup_index"], len(samples) - 2)
+    failures = evaluate(samples, warmup_index, args)
+    print_report(samples, result["top_stats"], failures)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"samples": samples, "warmup_index": warmup_index, "failures": failures}, f, indent=2)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
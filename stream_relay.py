@@ -0,0 +1,249 @@
+"""
+Relay one upstream video stream to many local viewers.
+
+Holds a single TCPClient connection to the camera host and re-serves the
+length-prefixed JPEG frames, byte for byte, to any number of downstream TCP
+viewers (same protocol as the video server, so TCPClient works unchanged).
+Optionally also serves the stream as multipart MJPEG over HTTP for browsers.
+Frames are never decoded. Each viewer has a small queue; when a viewer falls
+behind, its oldest queued frames are dropped instead of slowing the others.
+Control messages from viewers (send_state(), request_roi(), ...) are not
+passed upstream: the relay reads and discards them.
+
+    python stream_relay.py raspberrypi.local 5000 --listen-port 5001 --http-port 8080
+"""
+import argparse
+import socket
+import threading
+import time
+from collections import deque
+
+from networking_module import FRAME_HEADER, TCPClient, frame_header_size, pack_frame_header
+from transport import apply_socket_profile, send_frame
+
+
+MJPEG_BOUNDARY = b"frame"
+
+
+class RelayViewer:
+    """A downstream connection with its own bounded frame queue and sender thread."""
+
+    def __init__(self, conn, address, queue_size, http=False, send_buffer_size=None):
+        self.conn = conn
+        self.address = address
+        self.http = http
+        self.send_buffer_size = send_buffer_size
+        self.frames = deque(maxlen=queue_size)
+        self.condition = threading.Condition()
+        self.is_open = True
+        self.sent = 0
+        self.dropped = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def push(self, framed):
+        """Queue a frame, dropping the oldest one if the viewer is behind."""
+        with self.condition:
+            if len(self.frames) == self.frames.maxlen:
+                self.dropped += 1
+            self.frames.append(framed)
+            self.condition.notify()
+
+    def run(self):
+        try:
+            if self.http:
+                if not self._read_http_request():
+                    return
+                self.conn.sendall(
+                    b"HTTP/1.0 200 OK\r\n"
+                    b"Cache-Control: no-cache\r\n"
+                    b"Content-Type: multipart/x-mixed-replace; boundary=" + MJPEG_BOUNDARY + b"\r\n\r\n"
+                )
+            else:
+                threading.Thread(target=self._discard_input, daemon=True).start()
+            while self.is_open:
+                with self.condition:
+                    while self.is_open and not self.frames:
+                        self.condition.wait()
+                    if not self.is_open:
+                        break
+                    framed = self.frames.popleft()
+
+                if self.send_buffer_size and len(framed) > self.send_buffer_size:
+                    # Room for about one frame: enough to keep the link busy, too little to lag
+                    self.send_buffer_size = len(framed)
+                    self.conn.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer_size)
+                if self.http:
+                    # The CRLF ending the previous part leads this part's headers,
+                    # so each frame goes out in a single sendmsg
+                    header_size = frame_header_size(FRAME_HEADER.unpack_from(framed)[0])
+                    payload = memoryview(framed)[header_size:]
+                    part_header = (
+                        (b"\r\n" if self.sent else b"") + b"--" + MJPEG_BOUNDARY + b"\r\n"
+                        b"Content-Type: image/jpeg\r\n"
+                        b"Content-Length: " + str(len(payload)).encode() + b"\r\n\r\n"
+                    )
+                    send_frame(self.conn, part_header, payload)
+                else:
+                    self.conn.sendall(framed)
+                self.sent += 1
+        except OSError as e:
+            print(f"Viewer {self.address} disconnected: {e}")
+        finally:
+            self.close()
+
+    def _read_http_request(self):
+        """Consume the request headers; any path gets the stream."""
+        self.conn.settimeout(5)
+        request = b""
+        try:
+            while b"\r\n\r\n" not in request and len(request) < 8192:
+                chunk = self.conn.recv(1024)
+                if not chunk:
+                    return False
+                request += chunk
+        except OSError:
+            return False
+        self.conn.settimeout(None)
+        return request.startswith(b"GET ")
+
+    def _discard_input(self):
+        """Read and drop anything the viewer sends, closing it once it hangs up."""
+        warned = False
+        try:
+            while True:
+                data = self.conn.recv(4096)
+                if not data:
+                    break
+                if not warned:
+                    print(f"Viewer {self.address} sent control data; the relay does not forward it upstream")
+                    warned = True
+        except OSError:
+            pass
+        self.close()
+
+    def close(self):
+        with self.condition:
+            self.is_open = False
+            self.condition.notify()
+        try:
+            # shutdown() wakes a sender blocked on a stalled viewer
+            self.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.conn.close()
+
+
+class StreamRelay:
+    def __init__(self, upstream_address, upstream_port, listen_host="0.0.0.0", listen_port=5001,
+                 http_port=None, queue_size=2, send_buffer_size=64 * 1024, reconnect_delay=2.0):
+        self.upstream_address = upstream_address
+        self.upstream_port = upstream_port
+        self.listen_host = listen_host
+        self.listen_port = listen_port
+        self.http_port = http_port
+        self.queue_size = queue_size
+        self.send_buffer_size = send_buffer_size
+        self.reconnect_delay = reconnect_delay
+
+        self.client = None
+        self.viewers = []
+        self.viewers_lock = threading.Lock()
+        self.is_running = False
+        self.frames_relayed = 0
+        self.server_sockets = []
+
+    def start(self):
+        """Start the viewer listeners and the upstream receive loop in background threads."""
+        self.is_running = True
+        self._start_listener(self.listen_port, http=False)
+        if self.http_port is not None:
+            self._start_listener(self.http_port, http=True)
+        threading.Thread(target=self._run_upstream, daemon=True).start()
+
+    def stop(self):
+        self.is_running = False
+        if self.client:
+            self.client.disconnect()
+        for server_socket in self.server_sockets:
+            server_socket.close()
+        with self.viewers_lock:
+            viewers, self.viewers = self.viewers, []
+        for viewer in viewers:
+            viewer.close()
+
+    def broadcast(self, payload, timestamp=None):
+        """Hand one upstream frame to every viewer queue."""
+        # Keep the capture time only if upstream sent one, so viewers get the same header
+        if not self.client.sender_timestamps:
+            timestamp = None
+        # One immutable copy per frame, shared by all viewers
+        framed = pack_frame_header(len(payload), timestamp) + payload
+        self.frames_relayed += 1
+        with self.viewers_lock:
+            self.viewers = [viewer for viewer in self.viewers if viewer.is_open]
+            viewers = list(self.viewers)
+        for viewer in viewers:
+            viewer.push(framed)
+
+    def _start_listener(self, port, http):
+        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server_socket.bind((self.listen_host, port))
+        server_socket.listen(64)
+        self.server_sockets.append(server_socket)
+        kind = "HTTP MJPEG" if http else "TCP"
+        print(f"Relay listening for {kind} viewers on {self.listen_host}:{server_socket.getsockname()[1]}")
+        threading.Thread(target=self._accept_viewers, args=(server_socket, http), daemon=True).start()
+
+    def _accept_viewers(self, server_socket, http):
+        while self.is_running:
+            try:
+                conn, addr = server_socket.accept()
+            except OSError:
+                break
+            # Keep kernel buffering to about one frame so slow viewers drop frames
+            # here instead of lagging; the viewer grows it for larger frames
+            apply_socket_profile(conn, {"nodelay": True, "send_buffer": self.send_buffer_size})
+            viewer = RelayViewer(conn, addr, self.queue_size, http=http, send_buffer_size=self.send_buffer_size)
+            with self.viewers_lock:
+                self.viewers.append(viewer)
+            print(f"Viewer connected from {addr}")
+            viewer.thread.start()
+
+    def _run_upstream(self):
+        while self.is_running:
+            self.client = TCPClient(self.upstream_address, self.upstream_port)
+            self.client.connect()
+            if self.client.is_connected:
+                self.client.receive_raw_stream(self.broadcast, pass_timestamp=True)
+                self.client.disconnect()
+            if self.is_running:
+                time.sleep(self.reconnect_delay)
+
+    def viewer_stats(self):
+        """Return (address, sent, dropped) for each connected viewer."""
+        with self.viewers_lock:
+            return [(viewer.address, viewer.sent, viewer.dropped) for viewer in self.viewers]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Relay one upstream video stream to many viewers.")
+    parser.add_argument("upstream_address")
+    parser.add_argument("upstream_port", type=int)
+    parser.add_argument("--listen-host", default="0.0.0.0")
+    parser.add_argument("--listen-port", type=int, default=5001)
+    parser.add_argument("--http-port", type=int, default=None)
+    parser.add_argument("--queue-size", type=int, default=2)
+    args = parser.parse_args()
+
+    relay = StreamRelay(args.upstream_address, args.upstream_port, args.listen_host, args.listen_port,
+                        args.http_port, args.queue_size)
+    relay.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        relay.stop()
+        print("Relay shut down.")
@@ -0,0 +1,69 @@
+"""
+Startup-time guard for the control-only import path.
+
+Runs `python -X importtime` in a fresh interpreter for each entry module and
+fails if a video/GUI dependency is imported eagerly or if the cumulative import
+time exceeds the budget. Works under pytest or as a script:
+
+    python test_import_time.py
+    AIER_IMPORT_BUDGET_MS=400 python test_import_time.py    # slower hosts
+"""
+import os
+import subprocess
+import sys
+
+from dev_support import run_tests
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ("cv2", "numpy", "PIL", "multiprocessing")
+IMPORT_BUDGET_MS = float(os.environ.get("AIER_IMPORT_BUDGET_MS", "100"))
+
+
+def measure_import(module, runs=3):
+    """Return (imported module names, best cumulative import time of `module` in ms)."""
+    best_ms = None
+    imported = set()
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, cwd=HERE, check=True,
+        )
+        cumulative_us = None
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            name = name.strip()
+            imported.add(name.split(".")[0])
+            if name == module:
+                cumulative_us = int(cumulative)
+        if cumulative_us is not None and (best_ms is None or cumulative_us / 1000 < best_ms):
+            best_ms = cumulative_us / 1000
+    return imported, best_ms
+
+
+def test_networking_module_imports_only_stdlib():
+    imported, _ = measure_import("networking_module")
+    eager = [name for name in HEAVY_MODULES if name in imported]
+    assert not eager, f"networking_module eagerly imports {eager}"
+
+
+def test_gui_modules_defer_video_dependencies():
+    for module in ("gui_client_control", "client"):
+        imported, _ = measure_import(module)
+        eager = [name for name in HEAVY_MODULES if name in imported]
+        assert not eager, f"{module} eagerly imports {eager}"
+
+
+def test_control_client_import_time():
+    for module in ("networking_module", "test_client"):
+        _, elapsed_ms = measure_import(module)
+        assert elapsed_ms is not None, f"{module} was not imported"
+        assert elapsed_ms <= IMPORT_BUDGET_MS, (
+            f"import {module} took {elapsed_ms:.1f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)"
+        )
+        print(f"import {module}: {elapsed_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    run_tests(globals())
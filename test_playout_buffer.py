@@ -0,0 +1,41 @@
+"""
+PlayoutBuffer queue bounds: frames pushed after stop() are dropped, and a
+slow display callback cannot make the queue grow past `max_frames`.
+Works under pytest or as a script:
+
+    python test_playout_buffer.py
+"""
+import threading
+import time
+
+from dev_support import run_tests
+from networking_module import PlayoutBuffer
+
+
+def test_push_after_stop_is_dropped():
+    buffer = PlayoutBuffer(lambda frame: None)
+    buffer.start()
+    buffer.stop()
+    for i in range(100):
+        buffer.push(bytearray(1024), time.time())
+    assert len(buffer.frames) == 0
+    assert buffer.dropped == 100
+
+
+def test_slow_display_keeps_queue_bounded():
+    release = threading.Event()
+    buffer = PlayoutBuffer(lambda frame: release.wait(5), min_delay=0, max_frames=8)
+    buffer.start()
+    try:
+        for i in range(40):
+            buffer.push(bytearray(1024), time.time())
+            assert len(buffer.frames) <= buffer.max_frames
+        assert buffer.dropped > 0
+        assert buffer.received == 40
+    finally:
+        release.set()
+        buffer.stop()
+
+
+if __name__ == "__main__":
+    run_tests(globals())
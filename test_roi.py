@@ -0,0 +1,74 @@
+"""
+Region-of-interest control parsing and cropping on the video server.
+Works under pytest or as a script:
+
+    python test_roi.py
+"""
+import numpy as np
+
+from dev_support import run_tests
+from test_video_stream_server import MAX_PENDING_COMMAND, apply_roi, make_overview, parse_roi_commands
+
+
+def test_complete_command_with_default_overview_interval():
+    commands, remaining = parse_roi_commands(b"ROI:10,20,640,480,320,240\n")
+    assert commands == [(10, 20, 640, 480, 320, 240, 10)]
+    assert remaining == b""
+
+
+def test_command_split_across_reads():
+    buffer = b""
+    seen = []
+    for chunk in (b"STATE:SAFE\nR", b"OI:1,2,3", b",4,5,6,", b"7\nROI:OFF\n"):
+        commands, buffer = parse_roi_commands(buffer + chunk)
+        seen.extend(commands)
+    assert seen == [(1, 2, 3, 4, 5, 6, 7), None]
+    assert buffer == b""
+
+
+def test_roi_off():
+    commands, _ = parse_roi_commands(b"ROI:OFF\n")
+    assert commands == [None]
+
+
+def test_malformed_and_invalid_commands_are_skipped():
+    buffer = (b"ROI:a,b,c,d,e,f\n"         # not numbers
+              b"ROI:-1,0,10,10,10,10\n"    # negative offset
+              b"ROI:0,0,0,10,10,10\n"      # empty crop
+              b"ROI:0,0,10,10\n"           # too few values
+              b"ROI:0,0,10,10,10,10,5\n")
+    commands, _ = parse_roi_commands(buffer)
+    assert commands == [(0, 0, 10, 10, 10, 10, 5)]
+
+
+def test_unterminated_command_is_dropped():
+    buffer = b""
+    for _ in range(20):
+        _, buffer = parse_roi_commands(buffer + b"ROI:" + b"1" * 60)
+        assert len(buffer) <= MAX_PENDING_COMMAND + 64
+
+
+def test_roi_is_clipped_to_the_frame():
+    frame = np.arange(100 * 200 * 3, dtype=np.uint8).reshape(100, 200, 3)
+    # Native size: the crop itself, clipped at the right and bottom edges
+    crop = apply_roi(frame, (150, 80, 100, 100, 50, 20))
+    assert crop.shape == (20, 50, 3)
+    assert np.array_equal(crop, frame[80:100, 150:200])
+    # Offsets past the frame still yield a valid (one-pixel) crop
+    assert apply_roi(frame, (500, 500, 10, 10, 1, 1)).shape == (1, 1, 3)
+
+
+def test_output_size_is_capped_to_the_frame():
+    frame = np.zeros((100, 200, 3), dtype=np.uint8)
+    assert apply_roi(frame, (0, 0, 1, 1, 100000, 100000)).shape == (100, 100, 3)
+    assert apply_roi(frame, (0, 0, 50, 50, 400, 100)).shape == (50, 200, 3)
+    assert apply_roi(frame, (0, 0, 50, 50, 100, 50)).shape == (50, 100, 3)
+
+
+def test_overview_keeps_aspect_ratio():
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    assert make_overview(frame).shape == (180, 320, 3)
+
+
+if __name__ == "__main__":
+    run_tests(globals())
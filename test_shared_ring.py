@@ -0,0 +1,100 @@
+"""
+Shared-memory frame ring: decoded and JPEG round trips, oversized frames,
+slot reuse after wraparound and attaching to a block that is not a ring.
+Works under pytest or as a script:
+
+    python test_shared_ring.py
+"""
+import os
+import uuid
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from dev_support import run_tests
+from networking_module import (FRAME_KIND_DECODED, FRAME_KIND_JPEG, SharedFramePublisher,
+                               SharedFrameSubscriber)
+
+
+def ring_name():
+    return f"aier_test_{os.getpid()}_{uuid.uuid4().hex[:8]}"
+
+
+def test_decoded_and_jpeg_round_trip():
+    name = ring_name()
+    publisher = SharedFramePublisher(name, slot_size=64 * 64 * 3, slot_count=4)
+    subscriber = SharedFrameSubscriber(name)
+    try:
+        assert subscriber.read_latest() is None
+
+        frame = np.random.default_rng(0).integers(0, 256, (48, 64, 3), dtype=np.uint8)
+        assert publisher.publish_frame(frame) == 1
+        shared = subscriber.read_latest()
+        assert (shared.seq, shared.kind) == (1, FRAME_KIND_DECODED)
+        assert np.array_equal(shared.data, frame)
+        assert not shared.data.flags.writeable
+
+        gray = frame[..., 0]
+        publisher.publish_frame(gray)
+        assert np.array_equal(subscriber.read_latest(copy=True).data, gray)
+
+        payload = b"\xff\xd8" + os.urandom(1000) + b"\xff\xd9"
+        assert publisher.publish_payload(payload) == 3
+        shared = subscriber.read_latest(copy=True)
+        assert shared.kind == FRAME_KIND_JPEG
+        assert shared.data.tobytes() == payload
+        assert subscriber.wait_for_frame(last_seq=3, timeout=0.01) is None
+        assert subscriber.wait_for_frame(last_seq=2, timeout=0.01).seq == 3
+    finally:
+        shared = None
+        subscriber.close()
+        publisher.close()
+
+
+def test_oversized_frame_is_dropped():
+    name = ring_name()
+    publisher = SharedFramePublisher(name, slot_size=1024, slot_count=2)
+    subscriber = SharedFrameSubscriber(name)
+    try:
+        assert publisher.publish_payload(b"x" * 1025) is None
+        assert subscriber.latest_seq() == 0
+        assert publisher.publish_payload(b"x" * 1024) == 1
+    finally:
+        subscriber.close()
+        publisher.close()
+
+
+def test_frame_is_invalid_after_wraparound():
+    name = ring_name()
+    publisher = SharedFramePublisher(name, slot_size=16, slot_count=3)
+    subscriber = SharedFrameSubscriber(name)
+    try:
+        publisher.publish_payload(b"first")
+        frame = subscriber.read_latest()
+        for i in range(publisher.slot_count - 1):
+            publisher.publish_payload(b"newer")
+            assert subscriber.is_valid(frame)
+        # The next frame reuses the first frame's slot
+        publisher.publish_payload(b"wrapped")
+        assert not subscriber.is_valid(frame)
+    finally:
+        frame = None
+        subscriber.close()
+        publisher.close()
+
+
+def test_block_without_ring_header_is_rejected():
+    name = ring_name()
+    block = shared_memory.SharedMemory(name=name, create=True, size=4096)
+    try:
+        SharedFrameSubscriber(name)
+        raise AssertionError("attached to a block without the ring magic")
+    except ValueError:
+        pass
+    finally:
+        block.close()
+        block.unlink()
+
+
+if __name__ == "__main__":
+    run_tests(globals())
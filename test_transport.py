@@ -0,0 +1,145 @@
+"""
+Wire format and socket transport: frame header flags, FrameReader over
+arbitrarily chunked input, partial sendmsg writes and the frame size limit.
+Works under pytest or as a script:
+
+    python test_transport.py
+"""
+import os
+import random
+import socket
+import threading
+
+from dev_support import run_tests
+from networking_module import (FRAME_HEADER, OVERVIEW_FLAG, TIMESTAMP_FLAG, TCPClient,
+                               frame_header_size, pack_frame_header)
+from transport import FrameReader, send_frame
+
+
+def client_for(sock):
+    """A TCPClient reading from an already connected socket."""
+    client = TCPClient("127.0.0.1", 0)
+    client.socket = sock
+    client.is_connected = True
+    return client
+
+
+def send_in_chunks(sock, data, seed=0):
+    rng = random.Random(seed)
+    view = memoryview(data)
+    while view:
+        size = rng.randint(1, 9000)
+        sock.sendall(view[:size])
+        view = view[size:]
+    sock.close()
+
+
+def test_header_flags_round_trip():
+    plain = pack_frame_header(1234)
+    assert len(plain) == frame_header_size(FRAME_HEADER.unpack_from(plain)[0]) == 4
+    timed = pack_frame_header(1234, 1700000000.123456, overview=True)
+    size_word = FRAME_HEADER.unpack_from(timed)[0]
+    assert len(timed) == frame_header_size(size_word) == 12
+    assert size_word & TIMESTAMP_FLAG and size_word & OVERVIEW_FLAG
+
+    reader_sock, writer_sock = socket.socketpair()
+    threading.Thread(target=send_in_chunks, args=(writer_sock, plain + b"x" * 1234 + timed + b"y" * 1234)).start()
+    frames = [(bytes(p), t, o) for p, t, o in client_for(reader_sock).iter_frame_payloads()]
+    reader_sock.close()
+    assert [(p, o) for p, _, o in frames] == [(b"x" * 1234, False), (b"y" * 1234, True)]
+    assert round(frames[1][1] * 1e6) == 1700000000123456
+
+
+def test_chunked_stream_with_mixed_flags():
+    rng = random.Random(1)
+    expected, data = [], bytearray()
+    for i in range(200):
+        payload = os.urandom(rng.choice([1, 100, 5000, 70000, 300000]))
+        timestamp = 1700000000 + i / 30 if rng.random() < 0.5 else None
+        overview = rng.random() < 0.2
+        data += pack_frame_header(len(payload), timestamp, overview=overview) + payload
+        expected.append((payload, timestamp, overview))
+
+    reader_sock, writer_sock = socket.socketpair()
+    threading.Thread(target=send_in_chunks, args=(writer_sock, data)).start()
+    client = client_for(reader_sock)
+    received = []
+    for payload, timestamp, overview in client.iter_frame_payloads():
+        # Views are only valid until the next frame, so copy
+        received.append((bytes(payload), timestamp if client.sender_timestamps else None, overview))
+    reader_sock.close()
+
+    assert len(received) == len(expected)
+    for (payload, timestamp, overview), (want_payload, want_timestamp, want_overview) in zip(received, expected):
+        assert payload == want_payload
+        assert overview == want_overview
+        if want_timestamp is None:
+            assert timestamp is None
+        else:
+            assert abs(timestamp - want_timestamp) < 1e-6
+
+
+class RecordingSocket:
+    """Delegates to a real socket, recording what sendmsg reports as written."""
+
+    def __init__(self, sock):
+        self._sock = sock
+        self.sendmsg_results = []
+
+    def __getattr__(self, name):
+        return getattr(self._sock, name)
+
+    def sendmsg(self, buffers):
+        sent = self._sock.sendmsg(buffers)
+        self.sendmsg_results.append(sent)
+        return sent
+
+
+def test_send_frame_completes_partial_writes():
+    header = pack_frame_header(3 * 1024 * 1024, 1700000000.0)
+    payload = os.urandom(3 * 1024 * 1024)
+    reader_sock, writer_sock = socket.socketpair()
+    # A small send buffer on a socket with a timeout makes sendmsg come back short
+    writer_sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 64 * 1024)
+    writer_sock.settimeout(5)
+    writer = RecordingSocket(writer_sock)
+    received = bytearray()
+
+    def drain():
+        while True:
+            chunk = reader_sock.recv(65536)
+            if not chunk:
+                break
+            received.extend(chunk)
+
+    drainer = threading.Thread(target=drain)
+    drainer.start()
+    send_frame(writer, header, payload)
+    writer_sock.close()
+    drainer.join()
+    reader_sock.close()
+    assert writer.sendmsg_results[0] < len(header) + len(payload)
+    assert bytes(received) == header + payload
+
+
+def test_reads_over_max_size_are_rejected():
+    reader_sock, writer_sock = socket.socketpair()
+    reader = FrameReader(reader_sock, max_size=1024)
+    try:
+        reader.read_exact(1025)
+        raise AssertionError("read_exact accepted a read over max_size")
+    except ValueError:
+        pass
+    assert len(reader.buffer) == 256 * 1024
+
+    # A header announcing an oversized frame ends the stream before allocating
+    writer_sock.sendall(pack_frame_header(11 * 1024 * 1024))
+    writer_sock.close()
+    frames = []
+    client_for(reader_sock).receive_raw_stream(frames.append)
+    reader_sock.close()
+    assert frames == []
+
+
+if __name__ == "__main__":
+    run_tests(globals())
@@ -1,14 +1,102 @@
+import argparse
 import cv2
 import socket
-import struct
+import threading
+import time
 
-def run_video_stream_server(host="0.0.0.0", port=5000):
+import transport
+from networking_module import pack_frame_header
+
+
+MAX_PENDING_COMMAND = 256  # Longest incomplete "ROI:..." command kept between reads
+
+
+def parse_roi_commands(buffer):
+    """Extract complete "ROI:..." commands from received control bytes.
+
+    Returns (commands, remaining_bytes). Each command is either None (ROI:OFF)
+    or a tuple (x, y, width, height, output_width, output_height, overview_interval).
+    Other control messages are skipped.
+    """
+    commands = []
+    while True:
+        start = buffer.find(b"ROI:")
+        if start < 0:
+            # Keep a possible partial "ROI:" prefix for the next read
+            return commands, buffer[-3:]
+        end = buffer.find(b"\n", start)
+        if end < 0:
+            if len(buffer) - start > MAX_PENDING_COMMAND:
+                print("Dropping unterminated ROI command")
+                return commands, b""
+            return commands, buffer[start:]
+
+        body = buffer[start + 4:end].strip()
+        buffer = buffer[end + 1:]
+        if body == b"OFF":
+            commands.append(None)
+            continue
+        try:
+            values = [int(v) for v in body.split(b",")]
+        except ValueError:
+            print(f"Ignoring malformed ROI command: {body!r}")
+            continue
+        if len(values) == 6:
+            values.append(10)
+        if len(values) != 7 or min(values[2:]) <= 0 or min(values[:2]) < 0:
+            print(f"Ignoring invalid ROI command: {body!r}")
+            continue
+        commands.append(tuple(values))
+
+
+def apply_roi(frame, roi):
+    """Crop `frame` to the ROI (clipped to the frame) and scale it to the output size.
+
+    The output size is limited to the frame size, keeping its aspect ratio,
+    so a client cannot request an arbitrarily large upscale.
+    """
+    x, y, width, height, output_width, output_height = roi[:6]
+    frame_height, frame_width = frame.shape[:2]
+    scale = min(1.0, frame_width / output_width, frame_height / output_height)
+    if scale < 1.0:
+        output_width = max(1, int(output_width * scale))
+        output_height = max(1, int(output_height * scale))
+    x = min(x, frame_width - 1)
+    y = min(y, frame_height - 1)
+    crop = frame[y:min(y + height, frame_height), x:min(x + width, frame_width)]
+    if crop.shape[1] == output_width and crop.shape[0] == output_height:
+        return crop
+    shrinking = crop.shape[1] > output_width or crop.shape[0] > output_height
+    interpolation = cv2.INTER_AREA if shrinking else cv2.INTER_LINEAR
+    return cv2.resize(crop, (output_width, output_height), interpolation=interpolation)
+
+
+def make_overview(frame, overview_width=320):
+    """Downscale the whole frame, keeping its aspect ratio."""
+    frame_height, frame_width = frame.shape[:2]
+    overview_height = max(1, round(frame_height * overview_width / frame_width))
+    return cv2.resize(frame, (overview_width, overview_height), interpolation=cv2.INTER_AREA)
+
+
+def send_frame(conn, frame, captured_at, timestamped, overview=False):
+    # Encode the frame as JPEG
+    _, encoded_frame = cv2.imencode('.jpg', frame)
+
+    # Frame size (and capture time) followed by the frame data
+    header = pack_frame_header(len(encoded_frame), captured_at if timestamped else None, overview=overview)
+    transport.send_frame(conn, header, encoded_frame)
+
+
+def run_video_stream_server(host="0.0.0.0", port=5000, timestamped=False, capture_size=None,
+                            socket_profile="low_latency"):
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    transport.apply_socket_profile(server_socket, socket_profile)
     server_socket.bind((host, port))
     server_socket.listen(1)
     print(f"Server listening for video stream on {host}:{port}")
 
     conn, addr = server_socket.accept()
+    transport.apply_socket_profile(conn, socket_profile)
     print(f"Video stream connection established with {addr}")
 
     cap = cv2.VideoCapture(0)  # Use webcam for testing
@@ -17,21 +105,49 @@ def run_video_stream_server(host="0.0.0.0", port=5000):
         conn.close()
         server_socket.close()
         return
+    if capture_size:
+        # Capture at full sensor resolution so ROI crops stay sharp
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, capture_size[0])
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, capture_size[1])
+
+    # Region of interest requested by the client, updated by the control reader
+    state = {"roi": None}
+
+    def read_control_messages():
+        buffer = b""
+        try:
+            while True:
+                data = conn.recv(1024)
+                if not data:
+                    break
+                commands, buffer = parse_roi_commands(buffer + data)
+                for roi in commands:
+                    if roi is not None and capture_size and (roi[4] > capture_size[0] or roi[5] > capture_size[1]):
+                        print(f"Ignoring ROI output size larger than the capture size: {roi}")
+                        continue
+                    state["roi"] = roi
+                    print(f"Region of interest: {roi if roi else 'full frame'}")
+        except OSError:
+            pass
+
+    threading.Thread(target=read_control_messages, daemon=True).start()
 
     try:
+        frame_index = 0
         while True:
             ret, frame = cap.read()
             if not ret:
                 break
+            captured_at = time.time()
 
-            # Encode the frame as JPEG
-            _, encoded_frame = cv2.imencode('.jpg', frame)
-
-            # Send the frame size first
-            conn.sendall(struct.pack(">L", len(encoded_frame)))
-
-            # Send the frame data
-            conn.sendall(encoded_frame)
+            roi = state["roi"]
+            if roi is None:
+                send_frame(conn, frame, captured_at, timestamped)
+            else:
+                send_frame(conn, apply_roi(frame, roi), captured_at, timestamped)
+                if frame_index % roi[6] == 0:
+                    send_frame(conn, make_overview(frame), captured_at, timestamped, overview=True)
+            frame_index += 1
     except Exception as e:
         print(f"Error during streaming: {e}")
     finally:
@@ -40,5 +156,24 @@ def run_video_stream_server(host="0.0.0.0", port=5000):
         server_socket.close()
         print("Video stream server shut down.")
 
+
+def parse_size(text):
+    """Parse "WIDTHxHEIGHT" into a (width, height) tuple."""
+    try:
+        width, height = (int(v) for v in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {text!r}")
+    return width, height
+
+
 if __name__ == "__main__":
-    run_video_stream_server()
+    parser = argparse.ArgumentParser(description="Stream webcam frames to one client.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--timestamps", action="store_true",
+                        help="send capture times so clients can use Smooth Playout")
+    parser.add_argument("--capture-size", type=parse_size, default=None, metavar="WIDTHxHEIGHT",
+                        help="camera resolution, e.g. 1920x1080 for sharp ROI crops (default: camera default)")
+    args = parser.parse_args()
+
+    run_video_stream_server(args.host, args.port, timestamped=args.timestamps, capture_size=args.capture_size)
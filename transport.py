@@ -0,0 +1,112 @@
+"""
+Socket transport helpers shared by the video server and TCPClient.
+
+- Socket profiles: named sets of socket options (TCP_NODELAY, buffer sizes)
+  applied with `apply_socket_profile`.
+- `send_frame`: writes a frame header and payload with one `sendmsg`
+  scatter-gather call instead of one `sendall` per part, so a small header
+  never sits on its own waiting for Nagle/delayed ACK.
+- `FrameReader`: reads from the socket with large `recv_into` batches and
+  hands out zero-copy views of exactly the bytes requested. Reads larger
+  than `max_size` (MAX_FRAME_SIZE by default) raise ValueError, so a
+  corrupt or misframed size never turns into a huge allocation.
+
+Only the standard library is used so control-only clients stay light.
+"""
+import socket
+
+# Upper bound on a single frame (the legacy client accepted 1 KB to 10 MB)
+MAX_FRAME_SIZE = 10 * 1024 * 1024
+
+SOCKET_PROFILES = {
+    # Operating system defaults
+    "default": {},
+    # Interactive video: no Nagle delay, modest buffers to bound queueing
+    "low_latency": {"nodelay": True, "send_buffer": 256 * 1024, "recv_buffer": 256 * 1024},
+    # Bulk transfer (recording, relaying over fast links)
+    "throughput": {"nodelay": True, "send_buffer": 4 * 1024 * 1024, "recv_buffer": 4 * 1024 * 1024},
+}
+
+_HAS_SENDMSG = hasattr(socket.socket, "sendmsg")
+
+
+def apply_socket_profile(sock, profile="low_latency"):
+    """Apply a profile (a name from SOCKET_PROFILES or an options dict) to a TCP socket.
+
+    Buffer sizes should be applied before connect()/listen() so TCP window
+    scaling can take them into account.
+    """
+    options = SOCKET_PROFILES[profile] if isinstance(profile, str) else profile
+    try:
+        if "nodelay" in options:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, int(options["nodelay"]))
+        if options.get("send_buffer"):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, options["send_buffer"])
+        if options.get("recv_buffer"):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, options["recv_buffer"])
+    except OSError as e:
+        print(f"Failed to apply socket profile {profile!r}: {e}")
+
+
+def send_frame(sock, header, payload):
+    """Send `header` followed by `payload` in as few syscalls as possible."""
+    if not _HAS_SENDMSG:
+        sock.sendall(bytes(header) + bytes(payload))
+        return
+
+    header = memoryview(header).cast("B")
+    payload = memoryview(payload).cast("B")
+    total = len(header) + len(payload)
+    sent = sock.sendmsg([header, payload])
+    if sent == total:
+        return
+
+    # Partial write (large payload, full send buffer): finish with sendall
+    if sent < len(header):
+        sock.sendall(header[sent:])
+        sent = len(header)
+    sock.sendall(payload[sent - len(header):])
+
+
+class FrameReader:
+    """Buffered reader that fills a large buffer with recv_into and slices it.
+
+    `read_exact()` returns a memoryview that stays valid only until the next
+    call, because the buffer is compacted and refilled in place.
+    """
+
+    def __init__(self, sock, buffer_size=256 * 1024, max_size=MAX_FRAME_SIZE):
+        self.sock = sock
+        self.max_size = max_size
+        self.buffer = bytearray(buffer_size)
+        self.start = 0
+        self.end = 0
+
+    def read_exact(self, size):
+        """Return a view of the next `size` bytes, or None if the peer closed first."""
+        if size > self.max_size:
+            raise ValueError(f"Frame of {size} bytes exceeds the {self.max_size} byte limit")
+        if self.end - self.start < size:
+            pending = self.end - self.start
+            if size > len(self.buffer):
+                # Grow into a new buffer; earlier views keep the old one alive
+                buffer = bytearray(max(size, 2 * len(self.buffer)))
+                buffer[:pending] = self.buffer[self.start:self.end]
+                self.buffer = buffer
+                self.start, self.end = 0, pending
+            elif self.start + size > len(self.buffer):
+                self.buffer[:pending] = self.buffer[self.start:self.end]
+                self.start, self.end = 0, pending
+
+            view = memoryview(self.buffer)
+            while self.end - self.start < size:
+                count = self.sock.recv_into(view[self.end:], len(self.buffer) - self.end)
+                if count == 0:
+                    return None
+                self.end += count
+
+        start = self.start
+        self.start += size
+        if self.start == self.end:
+            self.start = self.end = 0
+        return memoryview(self.buffer)[start:start + size]